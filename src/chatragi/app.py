@@ -23,19 +23,21 @@ from markdown.extensions.fenced_code import FencedCodeExtension  # type: ignore
 from chatragi.utils.chat_memory import (
     fetch_all_memories,
     retrieve_memory,
-    store_memory,
+    store_memory_async,
 )
 
 # fmt: on
-from chatragi.utils.chatbot import query_engine, refresh_index
+from chatragi.utils.chatbot import (
+    extract_answer,
+    extract_citations,
+    query_engine,
+    refresh_index,
+)
 from chatragi.utils.db_utils import list_documents
 from chatragi.utils.error_handler import handle_exception
 from chatragi.utils.logger_config import logger
 from chatragi.utils.persona import PersonaTone, apply_persona_tone
 
-# Maximum number of citations to return
-MAX_SOURCES = 3
-
 app = Flask(__name__)
 
 # Register global error handler
@@ -244,26 +246,16 @@ def ask():
 
         # Query LLM
         response = query_engine.query(mod_prompt)
-        raw_answer = getattr(response, "response", str(response)).strip()
+        raw_answer = extract_answer(response)
 
         # Handle citations (same)
-        citations = []
-        source_nodes = getattr(response, "source_nodes", [])
-        seen = set()
-        for node in source_nodes:
-            metadata = getattr(node.node, "metadata", {})
-            source = metadata.get("file_name") or metadata.get("source")
-            if source and source not in seen:
-                citations.append(source)
-                seen.add(source)
-            if len(citations) >= MAX_SOURCES:
-                break
+        citations = extract_citations(response)
 
         # Format output for frontend
         formatted_answer = format_response(raw_answer)
 
-        # Store memory
-        store_memory(
+        # Store memory in the background
+        store_memory_async(
             user_query=user_query,
             response=raw_answer,
             is_important=False,
@@ -312,7 +304,9 @@ def store_memory_route():
                 400,
             )
 
-        store_memory(user_query, response, is_important)
+        # Queue behind any pending background write for the same exchange,
+        # so marking it important updates that entry instead of racing it
+        store_memory_async(user_query, response, is_important).result()
         return jsonify(
             {"status": "success", "message": "Memory stored successfully."}
         )
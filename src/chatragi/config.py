@@ -100,6 +100,11 @@ SIMILARITY_CUTOFF = float(
 # Max number of sources to include in the response
 MAX_SOURCES = 3
 
+# ------------------- ChromaDB Access -------------------
+
+# Page size for full-collection scans (keeps peak memory bounded)
+CHROMA_BATCH_SIZE = int(os.getenv("CHROMA_BATCH_SIZE", 10000))
+
 # ------------------- Memory Management -------------------
 
 # Time decay (in days) for memory retention logic
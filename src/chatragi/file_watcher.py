@@ -13,9 +13,14 @@ from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 from chatragi.config import DATA_FOLDER
-from chatragi.utils.db_utils import chroma_client
-from chatragi.utils.document_loader import process_new_documents
+from chatragi.utils.db_utils import doc_collection
+from chatragi.utils.document_loader import (
+    flush_index,
+    process_new_documents,
+    process_new_documents_batch,
+)
 from chatragi.utils.logger_config import logger
+from chatragi.utils.pdf_extractor import start_pdf_workers
 
 # Track already-processed files
 processed_files = set()
@@ -66,8 +71,7 @@ def process_existing_files():
     logger.info("Checking for unprocessed files in data folder...")
 
     try:
-        doc_collection = chroma_client.get_or_create_collection("doc_index")
-        existing_docs = set(doc_collection.get().get("documents", []))
+        pending_paths = []
 
         for file_name in os.listdir(DATA_FOLDER):
             file_path = os.path.join(DATA_FOLDER, file_name)
@@ -75,19 +79,19 @@ def process_existing_files():
             if not os.path.isfile(file_path) or not is_valid_file(file_name):
                 continue
 
-            if file_name in existing_docs:
-                logger.info(
-                    "File '%s' is already indexed. Skipping.",
-                    file_name,
-                )
-                continue
-
             if is_file_stable(file_path):
                 logger.info("Found unprocessed file: %s", file_path)
-                process_new_documents(file_path)
-                processed_files.add(file_name)
+                pending_paths.append(file_path)
+
+        # Index all unprocessed files in one pass; only files that were
+        # indexed are marked, so failures are retried on the next start
+        if pending_paths:
+            indexed_paths = process_new_documents_batch(pending_paths)
+            processed_files.update(
+                os.path.basename(path) for path in indexed_paths
+            )
 
-        indexed_count = len(doc_collection.get().get("documents", []))
+        indexed_count = doc_collection.count()
         logger.info(
             "ChromaDB now contains %d indexed document chunks.",
             indexed_count,
@@ -131,13 +135,10 @@ class NewFileHandler(FileSystemEventHandler):
                 )
                 return
 
-            process_new_documents(file_path)
-            processed_files.add(file_name)
+            if process_new_documents(file_path):
+                processed_files.add(file_name)
 
-            doc_collection = chroma_client.get_or_create_collection(
-                "doc_index"
-            )
-            indexed_count = len(doc_collection.get().get("documents", []))
+            indexed_count = doc_collection.count()
             logger.info(
                 "ChromaDB now contains %d indexed document chunks.",
                 indexed_count,
@@ -159,6 +160,9 @@ if __name__ == "__main__":
 
     observer = None
 
+    # Fork PDF workers before the observer or any executor thread starts
+    start_pdf_workers()
+
     try:
         process_existing_files()
 
@@ -185,3 +189,4 @@ if __name__ == "__main__":
     finally:
         if observer:
             observer.join()
+        flush_index()
@@ -7,12 +7,21 @@ flagging.
 """
 
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from hashlib import sha256
 
 from chatragi.utils.db_utils import memory_collection
 from chatragi.utils.logger_config import logger
 
+# Background writer for memories stored off the request path. A single worker
+# serializes store_memory's lookup-then-insert deduplication, which is only
+# race-free if every write goes through store_memory_async (callers that
+# need the write done wait on the returned Future).
+_memory_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="chatragi-memory"
+)
+
 
 def strip_sources_section(text: str) -> str:
     """
@@ -90,14 +99,16 @@ def store_memory(user_query: str, response: str, is_important: bool) -> None:
     # logger.debug("Generated memory key: %s", memory_key)
 
     try:
-        existing_results = memory_collection.get()
+        # Look the key up by metadata filter instead of scanning every entry
+        existing_results = memory_collection.get(
+            where={"memory_key": memory_key}, include=["metadatas"]
+        )
         existing_match_id = None
         existing_metadata = None
 
-        for doc, meta, doc_id in zip(
-            existing_results.get("documents", []),
-            existing_results.get("metadatas", []),
-            existing_results.get("ids", []),
+        for meta, doc_id in zip(
+            existing_results.get("metadatas") or [],
+            existing_results.get("ids") or [],
         ):
             meta = meta[0] if isinstance(meta, list) and meta else meta
             if not isinstance(meta, dict):
@@ -163,6 +174,28 @@ def store_memory(user_query: str, response: str, is_important: bool) -> None:
         logger.exception("Failed to store memory: %s", e)
 
 
+def store_memory_async(
+    user_query: str, response: str, is_important: bool
+) -> Future:
+    """
+    Schedules store_memory() on the background memory writer.
+
+    Lets callers return the answer to the user without waiting on the
+    ChromaDB write. Pending writes are flushed before interpreter exit.
+
+    Args:
+        user_query (str): Raw user input.
+        response (str): Raw AI response.
+        is_important (bool): Whether to mark the memory as important.
+
+    Returns:
+        Future: Completes once the memory has been stored.
+    """
+    return _memory_executor.submit(
+        store_memory, user_query, response, is_important
+    )
+
+
 def retrieve_memory(user_query: str) -> list:
     """
     Retrieves relevant chatbot memory entries based on a user query.
@@ -226,7 +259,7 @@ def fetch_all_memories() -> list:
         importance flag, and conversation text).
     """
     try:
-        results = memory_collection.get()
+        results = memory_collection.get(include=["documents", "metadatas"])
         memories = []
 
         for doc, meta in zip(
@@ -13,8 +13,11 @@ Main Features:
 """
 
 import os
+import sys
+import threading
 import time
 import warnings
+from typing import Optional
 
 from llama_index.core import Document, StorageContext, VectorStoreIndex
 from llama_index.core.query_engine import RetrieverQueryEngine
@@ -27,8 +30,8 @@ from chatragi.config import (
     SIMILARITY_CUTOFF,
     SIMILARITY_TOP_K,
 )
-from chatragi.utils.chat_memory import store_memory
-from chatragi.utils.db_utils import chroma_client
+from chatragi.utils.chat_memory import store_memory_async
+from chatragi.utils.db_utils import doc_collection
 from chatragi.utils.logger_config import logger
 from chatragi.utils.persona import PersonaTone, apply_persona_tone
 
@@ -38,38 +41,91 @@ warnings.filterwarnings("ignore")
 # Global query engine object
 query_engine = None
 
+# Interned citation file names, shared across queries so repeated sources
+# compare and hash by identity
+_filename_intern: dict[str, str] = {}
+
+# (chunk count, PERSIST_DIR mtime) observed at the last successful refresh
+_last_refresh_state: Optional[tuple[int, float]] = None
+
+# Guards the one-off embedding model warmup
+_warmup_started = threading.Event()
+
+
+def _warmup_embed_model() -> None:
+    """
+    Issues a throwaway embedding request so the first user query does not
+    pay the embedding model load cost.
+    """
+    try:
+        EMBED_MODEL.get_text_embedding("warmup")
+        logger.debug("Embedding model warmed up.")
+    except Exception as e:
+        logger.warning("Embedding model warmup failed: %s", e)
+
+
+def _index_state() -> tuple[int, float]:
+    """
+    Captures a cheap fingerprint of the indexed data.
+
+    Returns:
+        tuple[int, float]: Chunk count in ChromaDB and the newest
+        modification time among PERSIST_DIR entries.
+    """
+    persist_mtime = 0.0
+    if os.path.isdir(PERSIST_DIR):
+        with os.scandir(PERSIST_DIR) as entries:
+            persist_mtime = max(
+                (entry.stat().st_mtime for entry in entries), default=0.0
+            )
+    return doc_collection.count(), persist_mtime
+
 
 def refresh_index():
     """
     Initializes or refreshes the vector index and sets up the query engine.
 
     Loads an existing index from disk if available; otherwise builds a new one
-    from ChromaDB.
+    from ChromaDB. Returns early when nothing changed since the last refresh.
     """
-    global query_engine
+    global query_engine, _last_refresh_state
 
     try:
+        if query_engine is not None and _index_state() == _last_refresh_state:
+            logger.info("Index unchanged since last refresh. Skipping.")
+            return
+
         logger.info("Refreshing index...")
-        time.sleep(2)
 
-        doc_collection = chroma_client.get_or_create_collection("doc_index")
-        stored_docs = doc_collection.get()
+        # Warm the embedding model in the background while the index loads
+        if not _warmup_started.is_set():
+            _warmup_started.set()
+            threading.Thread(
+                target=_warmup_embed_model,
+                name="chatragi-embed-warmup",
+                daemon=True,
+            ).start()
+
+        time.sleep(2)
 
+        vector_store = ChromaVectorStore(chroma_collection=doc_collection)
         storage_context = StorageContext.from_defaults(
-            vector_store=ChromaVectorStore(chroma_collection=doc_collection)
+            vector_store=vector_store
         )
 
         if os.path.exists(PERSIST_DIR) and os.listdir(PERSIST_DIR):
             logger.info("Loading existing index from disk.")
             index = VectorStoreIndex.from_vector_store(
-                vector_store=ChromaVectorStore(
-                    chroma_collection=doc_collection
-                ),
+                vector_store=vector_store,
                 storage_context=storage_context,
                 embed_model=EMBED_MODEL,
             )
         else:
             logger.info("Building new vector index from ChromaDB documents.")
+            # Only the rebuild path needs the stored chunks themselves
+            stored_docs = doc_collection.get(
+                include=["documents", "metadatas"]
+            )
             documents = [
                 Document(text=doc_text, metadata=meta)
                 for doc_text, meta in zip(
@@ -93,12 +149,64 @@ def refresh_index():
             ),
             include_source=True,
         )
+        _last_refresh_state = _index_state()
 
     except Exception as e:
         logger.exception("Failed to refresh index: %s", e)
         raise
 
 
+def extract_answer(response) -> str:
+    """
+    Extracts the stripped answer text from a query response.
+
+    Falls back to str(response) only when the response carries no answer
+    attribute, so large response objects are not stringified needlessly.
+
+    Args:
+        response: Response object returned by the query engine.
+
+    Returns:
+        str: The answer text.
+    """
+    answer = getattr(response, "response", None)
+    if answer is None:
+        answer = str(response)
+    return answer.strip()
+
+
+def extract_citations(response) -> list[str]:
+    """
+    Extracts up to MAX_SOURCES unique source file names from a query response.
+
+    Args:
+        response: Response object returned by the query engine.
+
+    Returns:
+        list[str]: Unique source names in retrieval order.
+    """
+    citations: list[str] = []
+    seen: set[str] = set()
+
+    for node in getattr(response, "source_nodes", []):
+        metadata = getattr(node.node, "metadata", {})
+        raw = metadata.get("file_name") or metadata.get("source")
+        if not raw:
+            continue
+
+        source = _filename_intern.get(raw)
+        if source is None:
+            source = _filename_intern.setdefault(raw, sys.intern(raw))
+
+        if source not in seen:
+            citations.append(source)
+            seen.add(source)
+            if len(citations) >= MAX_SOURCES:
+                break
+
+    return citations
+
+
 def ask_bot(user_input: str, persona: str = "default") -> str:
     """
     Sends a query to the chatbot after applying persona-based tone adjustment.
@@ -124,15 +232,17 @@ def ask_bot(user_input: str, persona: str = "default") -> str:
     except ValueError:
         tone = PersonaTone.DEFAULT
 
-    # Apply persona-specific transformation to the input
+    # Apply persona-specific transformation to the input. Not memoized: a
+    # cache lookup hashes the whole prompt and costs more than the
+    # concatenation it saves on long prompts
     mod_prompt = apply_persona_tone(user_input, tone)
 
     # Query the LLM engine
     response = query_engine.query(mod_prompt)
-    raw_response = getattr(response, "response", str(response)).strip()
+    raw_response = extract_answer(response)
 
     # Store conversation memory (save original user input and raw response)
-    store_memory(
+    store_memory_async(
         user_query=user_input, response=raw_response, is_important=False
     )
 
@@ -165,24 +275,13 @@ def ask_chatbot(query: str) -> dict:
         response = query_engine.query(query)
 
         # Safely extract the answer
-        ai_answer = getattr(response, "response", str(response)).strip()
+        ai_answer = extract_answer(response)
 
         # Extract citations (up to MAX_SOURCES unique ones)
-        citations = []
-        seen = set()
-        source_nodes = getattr(response, "source_nodes", [])
-
-        for node in source_nodes:
-            metadata = getattr(node.node, "metadata", {})
-            source = metadata.get("file_name") or metadata.get("source")
-            if source and source not in seen:
-                citations.append(source)
-                seen.add(source)
-            if len(citations) >= MAX_SOURCES:
-                break
+        citations = extract_citations(response)
 
-        # Save memory
-        store_memory(query, ai_answer, is_important=False)
+        # Save memory in the background
+        store_memory_async(query, ai_answer, is_important=False)
 
         return {
             "answer": ai_answer,
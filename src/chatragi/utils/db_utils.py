@@ -7,14 +7,22 @@ This module provides functions for interacting with ChromaDB, including:
 - Listing and removing indexed documents
 """
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Iterator
 
 import chromadb
 
-from chatragi.config import DB_PATH, TIME_DECAY_DAYS
+from chatragi.config import CHROMA_BATCH_SIZE, DB_PATH, TIME_DECAY_DAYS
 from chatragi.utils.logger_config import logger
 
-# Initialize ChromaDB client and key collections
+# Max ids per ChromaDB delete request, and how many requests run at once
+DELETE_BATCH_SIZE = 1000
+DELETE_WORKERS = 4
+
+# Initialize ChromaDB client and key collections. Other modules import these
+# handles rather than opening their own client or re-resolving collections.
 try:
     chroma_client = chromadb.PersistentClient(path=DB_PATH)
     memory_collection = chroma_client.get_or_create_collection("chat_memory")
@@ -24,6 +32,65 @@ except Exception as e:
     logger.exception("Error initializing ChromaDB: %s", e)
 
 
+def iter_collection_pages(
+    collection, include: list[str], batch_size: int = CHROMA_BATCH_SIZE
+) -> Iterator[dict]:
+    """
+    Streams a collection in fixed-size pages instead of one large get().
+
+    Args:
+        collection: ChromaDB collection to scan.
+        include (list[str]): Fields to fetch (e.g. ["metadatas"]).
+        batch_size (int): Maximum number of records per page.
+
+    Yields:
+        dict: One ChromaDB get() result per page.
+    """
+    offset = 0
+    while True:
+        page = collection.get(include=include, limit=batch_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            return
+
+        yield page
+
+        if len(ids) < batch_size:
+            return
+        offset += batch_size
+
+
+def delete_ids_in_batches(collection, ids: list[str]) -> None:
+    """
+    Deletes ids from a collection in DELETE_BATCH_SIZE shards.
+
+    Avoids shipping one oversized delete request; shards run concurrently
+    on a small thread pool.
+
+    Args:
+        collection: ChromaDB collection to delete from.
+        ids (list[str]): Record ids to delete.
+    """
+
+    def delete_batch(batch: list[str]) -> None:
+        collection.delete(ids=batch)
+        logger.debug("Deleted batch of %d records.", len(batch))
+
+    batches = []
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        end = start + DELETE_BATCH_SIZE
+        batches.append(ids[start:end])
+
+    if len(batches) <= 1:
+        for batch in batches:
+            delete_batch(batch)
+        return
+
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        # Consume the results so a failed shard re-raises here
+        list(executor.map(delete_batch, batches))
+
+
 def delete_non_important_memories() -> None:
     """
     Deletes chatbot memory older than TIME_DECAY_DAYS unless marked as
@@ -34,30 +101,30 @@ def delete_non_important_memories() -> None:
     cutoff_date = datetime.utcnow() - timedelta(days=TIME_DECAY_DAYS)
 
     try:
-        results = memory_collection.get()
-        # documents = results.get("documents", [])
-        metadatas = results.get("metadatas", [])
-        ids = results.get("ids", [])
-
         ids_to_delete = []
 
-        for meta, doc_id in zip(metadatas, ids):
-            meta = meta[0] if isinstance(meta, list) and meta else meta
-            if not isinstance(meta, dict):
-                continue
+        # Scan metadata only, page by page; memory texts are never loaded
+        for page in iter_collection_pages(memory_collection, ["metadatas"]):
+            for meta, doc_id in zip(page.get("metadatas") or [], page["ids"]):
+                meta = meta[0] if isinstance(meta, list) and meta else meta
+                if not isinstance(meta, dict):
+                    continue
 
-            timestamp = meta.get("timestamp")
-            if not timestamp:
-                logger.warning("Skipping entry without timestamp: %s", meta)
-                continue
+                timestamp = meta.get("timestamp")
+                if not timestamp:
+                    logger.warning(
+                        "Skipping entry without timestamp: %s", meta
+                    )
+                    continue
 
-            stored_time = datetime.fromisoformat(timestamp)
+                stored_time = datetime.fromisoformat(timestamp)
+                important = meta.get("important", False)
 
-            if stored_time < cutoff_date and not meta.get("important", False):
-                ids_to_delete.append(doc_id)
+                if stored_time < cutoff_date and not important:
+                    ids_to_delete.append(doc_id)
 
         if ids_to_delete:
-            memory_collection.delete(ids=ids_to_delete)
+            delete_ids_in_batches(memory_collection, ids_to_delete)
             logger.info(
                 "Deleted %d non-important memories older than %d days.",
                 len(ids_to_delete),
@@ -78,7 +145,7 @@ def log_indexed_documents() -> None:
     Logs the total number of indexed documents in ChromaDB.
     """
     try:
-        num_stored_docs = len(doc_collection.get().get("documents", []))
+        num_stored_docs = doc_collection.count()
         logger.info("ChromaDB contains %d indexed documents.", num_stored_docs)
     except Exception as e:
         logger.exception("Unable to count stored documents: %s", e)
@@ -112,35 +179,35 @@ def list_documents() -> list[dict]:
         list[dict]: List of documents with file_name, source, and chunk count.
     """
     try:
-        stored_docs = doc_collection.get()
-        metadatas = stored_docs.get("metadatas", [])
-
-        if not metadatas:
+        chunk_counts: Counter = Counter()
+        sources: dict[str, str] = {}
+
+        for page in iter_collection_pages(doc_collection, ["metadatas"]):
+            for meta in page.get("metadatas") or []:
+                meta = meta[0] if isinstance(meta, list) and meta else meta
+                if not isinstance(meta, dict):
+                    continue
+
+                file_name = meta.get("file_name")
+                if file_name:
+                    chunk_counts[file_name] += 1
+                    if file_name not in sources:
+                        sources[file_name] = meta.get("source", "unknown")
+
+        if not chunk_counts:
             logger.info("No documents found in ChromaDB.")
             return []
 
-        file_stats = {}
-
-        for meta in metadatas:
-            meta = meta[0] if isinstance(meta, list) and meta else meta
-            if not isinstance(meta, dict):
-                continue
-
-            file_name = meta.get("file_name")
-            source = meta.get("source", "unknown")
-
-            if file_name:
-                if file_name not in file_stats:
-                    file_stats[file_name] = {
-                        "file_name": file_name,
-                        "source": source,
-                        "chunks": 1,
-                    }
-                else:
-                    file_stats[file_name]["chunks"] += 1
-
         results = sorted(
-            file_stats.values(), key=lambda x: x["file_name"].lower()
+            (
+                {
+                    "file_name": file_name,
+                    "source": sources[file_name],
+                    "chunks": chunks,
+                }
+                for file_name, chunks in chunk_counts.items()
+            ),
+            key=lambda x: x["file_name"].lower(),
         )
 
         logger.info("Stored Documents in ChromaDB:")
@@ -5,15 +5,18 @@ Handles ingestion of PDF, CSV, JSON, TXT documents into ChromaDB.
 Splits files into chunks, attaches metadata, and checks for duplication.
 """
 
+import glob
 import hashlib
 import json
 import os
 import re
 import shutil
-from typing import List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import pandas as pd
-import pdfplumber
 from llama_index.core import Document, StorageContext, VectorStoreIndex
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
@@ -24,8 +27,9 @@ from chatragi.config import (
     EMBED_MODEL,
     PERSIST_DIR,
 )
-from chatragi.utils.db_utils import chroma_client
+from chatragi.utils.db_utils import doc_collection
 from chatragi.utils.logger_config import logger
+from chatragi.utils.pdf_extractor import extract_pdf_text
 
 # Optional tokenizer for token estimation
 try:
@@ -35,13 +39,129 @@ try:
 except ImportError:
     tokenizer = None
 
+# Optional Rust-backed JSON parser/serializer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Read size for file hashing; large blocks amortize syscall overhead
+HASH_READ_SIZE = 1 << 20  # 1 MiB
+
+# Sentence boundary: whitespace following terminal punctuation
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Sentences per tiktoken batch call while streaming a document
+TOKENIZE_BATCH_SIZE = 1024
+
+# Rows per CSV shard; bounds the size of each rendered table string
+CSV_READ_ROWS = 10_000
+
+# Max chunk hashes per "$in" duplicate lookup (stays under SQLite limits)
+HASH_QUERY_BATCH_SIZE = 500
+
+# Persists index storage off the ingest path; one worker keeps writes ordered
+_persist_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="chatragi-persist"
+)
+_pending_persist: Optional[Future] = None
+
+
+def has_stored_file(file_hash: str) -> bool:
+    """
+    Checks whether a file with this content hash has already been indexed.
+
+    Args:
+        file_hash (str): SHA-256 hash of the file contents.
+
+    Returns:
+        bool: True if any stored chunk carries this file hash.
+    """
+    matches = doc_collection.get(
+        where={"file_hash": file_hash}, include=[], limit=1
+    )
+    return bool(matches.get("ids"))
+
+
+def has_legacy_copy(file_path: str, file_hash: str) -> bool:
+    """
+    Checks whether this file was indexed before file hashes were stored.
+
+    Such chunks carry no file_hash, and their boundaries came from the
+    older chunker, so neither the file-hash nor the chunk-hash check
+    matches them. The copy is recognized instead by comparing the file
+    with its archived namesake (same size, then same content hash).
+
+    Args:
+        file_path (str): Full path to the new document.
+        file_hash (str): SHA-256 hash of the new document.
 
-def move_to_archive(filename: str):
+    Returns:
+        bool: True if a legacy copy with identical content is indexed.
+    """
+    file_name = os.path.basename(file_path)
+    matches = doc_collection.get(
+        where={"file_name": file_name}, include=["metadatas"]
+    )
+    if not any(
+        "file_hash" not in (meta or {})
+        for meta in matches.get("metadatas") or []
+    ):
+        return False
+
+    # Archived under its own name, or with a suffix after a name collision
+    base, ext = os.path.splitext(file_name)
+    candidates = [os.path.join(ARCHIVE_FOLDER, file_name)] + glob.glob(
+        os.path.join(
+            glob.escape(ARCHIVE_FOLDER),
+            f"{glob.escape(base)}_*{glob.escape(ext)}",
+        )
+    )
+    size = os.path.getsize(file_path)
+    return any(
+        os.path.isfile(candidate)
+        and os.path.getsize(candidate) == size
+        and compute_file_hash(candidate) == file_hash
+        for candidate in candidates
+    )
+
+
+def has_stored_chunks(chunk_hashes: List[str]) -> bool:
+    """
+    Checks whether any of the given chunk hashes is already indexed.
+
+    Uses ChromaDB's metadata "$in" filter so only matching records are
+    looked up, instead of scanning the whole collection.
+
+    Args:
+        chunk_hashes (List[str]): Chunk hashes to look up.
+
+    Returns:
+        bool: True if at least one hash is already stored.
+    """
+    unique_hashes = list(dict.fromkeys(chunk_hashes))
+    for start in range(0, len(unique_hashes), HASH_QUERY_BATCH_SIZE):
+        end = start + HASH_QUERY_BATCH_SIZE
+        matches = doc_collection.get(
+            where={"hash": {"$in": unique_hashes[start:end]}},
+            include=[],
+            limit=1,
+        )
+        if matches.get("ids"):
+            return True
+    return False
+
+
+def move_to_archive(filename: str, file_hash: str = ""):
     """
     Moves a processed file to the archive folder to avoid reprocessing.
 
+    On a name collision the file's content hash is appended to the name;
+    a numeric suffix is probed only when no hash is available.
+
     Args:
         filename (str): Name of the file.
+        file_hash (str): Content hash of the file, if already computed.
     """
     src_path = os.path.join(DATA_FOLDER, filename)
     dest_path = os.path.join(ARCHIVE_FOLDER, filename)
@@ -52,7 +172,12 @@ def move_to_archive(filename: str):
         )
         return
 
-    if os.path.exists(dest_path):
+    if os.path.exists(dest_path) and file_hash:
+        base, ext = os.path.splitext(filename)
+        dest_path = os.path.join(
+            ARCHIVE_FOLDER, f"{base}_{file_hash[:12]}{ext}"
+        )
+    elif os.path.exists(dest_path):
         base, ext = os.path.splitext(filename)
         counter = 1
         while os.path.exists(
@@ -65,6 +190,21 @@ def move_to_archive(filename: str):
     logger.info("Moved file '%s' to archive.", filename)
 
 
+def advise_sequential(f) -> None:
+    """
+    Hints the OS that a file will be read front to back, enabling more
+    aggressive read-ahead. No-op where posix_fadvise is unavailable.
+
+    Args:
+        f: Open file object.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
 def compute_file_hash(file_path: str) -> str:
     """
     Computes a SHA-256 hash of file contents.
@@ -75,12 +215,18 @@ def compute_file_hash(file_path: str) -> str:
     Returns:
         str: File hash or empty string if error.
     """
-    hasher = hashlib.sha256()
     try:
         with open(file_path, "rb") as f:
-            while chunk := f.read(8192):
+            advise_sequential(f)
+
+            # Python 3.11+: C-level read loop straight into OpenSSL
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+
+            hasher = hashlib.sha256()
+            while chunk := f.read(HASH_READ_SIZE):
                 hasher.update(chunk)
-        return hasher.hexdigest()
+            return hasher.hexdigest()
     except Exception as e:
         logger.exception("Error computing hash for '%s': %s", file_path, e)
         return ""
@@ -90,21 +236,82 @@ def estimate_tokens(text: str) -> int:
     """
     Estimates number of tokens in the given text.
 
+    Uses the tiktoken tokenizer when available, otherwise a whitespace
+    word count.
+
     Args:
         text (str): Input text.
 
     Returns:
         int: Approximate token count.
     """
+    if tokenizer is not None:
+        return len(tokenizer.encode_ordinary(text))
     return len(text.split())
 
 
+def iter_sentences(text: str) -> Iterator[str]:
+    """
+    Lazily yields sentences from text without building a sentence list.
+
+    Produces the same pieces as _SENTENCE_SPLIT_RE.split(text).
+
+    Args:
+        text (str): Full document text.
+
+    Yields:
+        str: One sentence at a time.
+    """
+    start = 0
+    for match in _SENTENCE_SPLIT_RE.finditer(text):
+        end, next_start = match.span()
+        yield text[start:end]
+        start = next_start
+    yield text[start:]
+
+
+def _iter_counted_sentences(text: str) -> Iterator[Tuple[str, int]]:
+    """
+    Yields (sentence, token count) pairs, tokenizing in bounded batches.
+
+    Identical sentences are counted once per document, keyed by their text;
+    the counts are dropped when the document has been chunked.
+
+    Args:
+        text (str): Full document text.
+
+    Yields:
+        Tuple[str, int]: Sentence and its token count.
+    """
+    sentences = iter_sentences(text)
+
+    if tokenizer is None:
+        counts: Dict[str, int] = {}
+        for sentence in sentences:
+            count = counts.get(sentence)
+            if count is None:
+                count = counts[sentence] = estimate_tokens(sentence)
+            yield sentence, count
+        return
+
+    while batch := list(islice(sentences, TOKENIZE_BATCH_SIZE)):
+        unique = list(dict.fromkeys(batch))
+        encoded = tokenizer.encode_ordinary_batch(unique)
+        counts = {s: len(ids) for s, ids in zip(unique, encoded)}
+        for sentence in batch:
+            yield sentence, counts[sentence]
+
+
 def split_text_into_chunks(
     text: str, max_tokens: int = CONTEXT_WINDOW, overlap_ratio: float = 0.2
 ) -> List[str]:
     """
     Splits text into overlapping chunks based on sentences.
 
+    Each chunk starts with trailing sentences of the previous chunk, up to
+    the overlap token budget. A single sentence longer than max_tokens
+    becomes a chunk of its own.
+
     Args:
         text (str): Full document text.
         max_tokens (int): Maximum tokens per chunk.
@@ -113,27 +320,48 @@ def split_text_into_chunks(
     Returns:
         List[str]: List of text chunks.
     """
-    sentences = re.split(r"(?<=[.!?])\s+", text)
     chunks: List[str] = []
-    current_chunk: List[str] = []
+    # Sliding window of (sentence, token count) pairs and its token total
+    window: deque = deque()
+    window_tokens = 0
     overlap = int(max_tokens * overlap_ratio)
 
-    for sentence in sentences:
-        tokens_in_sentence = estimate_tokens(sentence)
-        tokens_in_chunk = sum(estimate_tokens(s) for s in current_chunk)
+    for sentence, tokens_in_sentence in _iter_counted_sentences(text):
+        if window and window_tokens + tokens_in_sentence > max_tokens:
+            chunks.append(" ".join(s for s, _ in window))
 
-        if tokens_in_chunk + tokens_in_sentence <= max_tokens:
-            current_chunk.append(sentence)
-        else:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = current_chunk[-overlap:] + [sentence]
+            # Keep only the overlap tail, leaving room for the new sentence
+            while window and (
+                window_tokens > overlap
+                or window_tokens + tokens_in_sentence > max_tokens
+            ):
+                window_tokens -= window.popleft()[1]
+
+        window.append((sentence, tokens_in_sentence))
+        window_tokens += tokens_in_sentence
 
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+    if window:
+        chunks.append(" ".join(s for s, _ in window))
 
     return chunks
 
 
+def compute_chunk_hash(chunk: str) -> str:
+    """
+    Computes the deduplication key for a text chunk.
+
+    MD5 is kept for compatibility with hashes already stored in ChromaDB;
+    it is used as a non-cryptographic fingerprint only.
+
+    Args:
+        chunk (str): Chunk text.
+
+    Returns:
+        str: Hex digest of the chunk.
+    """
+    return hashlib.md5(chunk.encode(), usedforsecurity=False).hexdigest()
+
+
 def chunk_text(text: str, file_name: str, source: str) -> List[dict]:
     """
     Prepares structured chunks with metadata for a document.
@@ -153,7 +381,7 @@ def chunk_text(text: str, file_name: str, source: str) -> List[dict]:
             "metadata": {
                 "file_name": file_name,
                 "source": source,
-                "hash": hashlib.md5(chunk.encode()).hexdigest(),
+                "hash": compute_chunk_hash(chunk),
             },
         }
         for chunk in chunks
@@ -172,12 +400,7 @@ def load_pdf(file_path: str) -> List[dict]:
         List[dict]: Chunked document.
     """
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text = "\n\n".join(
-                page.extract_text()
-                for page in pdf.pages
-                if page.extract_text()
-            )
+        text = extract_pdf_text(file_path)
 
         if not text.strip():
             logger.warning(
@@ -205,15 +428,18 @@ def load_csv(file_path: str) -> List[dict]:
         List[dict]: Chunked document.
     """
     try:
-        df = pd.read_csv(file_path)
-        if df.empty:
-            logger.warning(
-                "Skipping empty CSV: %s", os.path.basename(file_path)
-            )
-            return []
-
-        text = df.to_string(index=False)
-        return chunk_text(text, os.path.basename(file_path), "csv")
+        file_name = os.path.basename(file_path)
+        chunks: List[dict] = []
+
+        # Render and chunk one row shard at a time instead of the whole table
+        for shard in pd.read_csv(file_path, chunksize=CSV_READ_ROWS):
+            if not shard.empty:
+                text = shard.to_string(index=False)
+                chunks.extend(chunk_text(text, file_name, "csv"))
+
+        if not chunks:
+            logger.warning("Skipping empty CSV: %s", file_name)
+        return chunks
     except Exception as e:
         logger.exception(
             "Error processing CSV '%s': %s", os.path.basename(file_path), e
@@ -221,6 +447,49 @@ def load_csv(file_path: str) -> List[dict]:
         return []
 
 
+def _json_loads(text: str):
+    """
+    Parses JSON text, using orjson when available.
+
+    Input orjson rejects but the stdlib accepts (NaN/Infinity, integers
+    beyond 64 bits) is re-parsed with the stdlib, so the set of loadable
+    files does not depend on whether orjson is installed.
+
+    Args:
+        text (str): JSON text.
+
+    Returns:
+        Parsed JSON value.
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _json_dumps(value) -> str:
+    """
+    Serializes a JSON value on a single line.
+
+    Always uses the stdlib: the output becomes chunk text, so it must not
+    vary with optional packages (orjson writes different separators and
+    float forms), or chunk hashes and embeddings would differ between
+    environments.
+
+    Args:
+        value: JSON-serializable value.
+
+    Returns:
+        str: JSON text with non-ASCII characters left unescaped.
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
 def load_json(file_path: str) -> List[dict]:
     """
     Loads text from a JSON or JSONL file.
@@ -233,11 +502,15 @@ def load_json(file_path: str) -> List[dict]:
     """
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                f.seek(0)
-                data = [json.loads(line) for line in f if line.strip()]
+            raw = f.read()
+
+        # Parse from memory; fall back to JSONL without re-reading the file
+        lines = None
+        try:
+            data = _json_loads(raw)
+        except json.JSONDecodeError:
+            lines = [line.strip() for line in raw.splitlines() if line.strip()]
+            data = [_json_loads(line) for line in lines]
 
         if not data:
             logger.warning(
@@ -246,7 +519,16 @@ def load_json(file_path: str) -> List[dict]:
             return []
 
         source = "jsonl" if isinstance(data, list) else "json"
-        text = json.dumps(data, indent=2)
+
+        # Render one record per line without pretty-printing; JSONL records
+        # are already in that form
+        if lines is not None:
+            text = "\n".join(lines)
+        elif isinstance(data, list):
+            text = "\n".join(_json_dumps(item) for item in data)
+        else:
+            text = _json_dumps(data)
+
         return chunk_text(text, os.path.basename(file_path), source)
     except Exception as e:
         logger.exception(
@@ -267,6 +549,7 @@ def load_txt(file_path: str) -> List[dict]:
     """
     try:
         with open(file_path, "r", encoding="utf-8") as f:
+            advise_sequential(f)
             text = f.read().strip()
 
         if not text:
@@ -309,13 +592,42 @@ def load_document(file_path: str) -> List[dict]:
     return loaders[ext](file_path)
 
 
-def process_new_documents(file_path: str):
+def _log_persist_failure(future: Future) -> None:
     """
-    Processes a new file: splits, checks for duplicates, and indexes
-    into ChromaDB.
+    Logs an error raised by a background index persist.
+
+    Args:
+        future (Future): Completed persist task.
+    """
+    error = future.exception()
+    if error is not None:
+        logger.error("Failed to persist index storage: %s", error)
+
+
+def flush_index() -> None:
+    """
+    Blocks until the most recently scheduled index persist has finished.
+    """
+    if _pending_persist is not None:
+        _pending_persist.exception()
+
+
+def _prepare_document(
+    file_path: str, batch_hashes: Set[str]
+) -> Optional[Tuple[str, List[dict]]]:
+    """
+    Hashes, loads and duplicate-checks a single file ahead of indexing.
+
+    Duplicates (already stored, or repeated within the current batch) are
+    archived immediately.
 
     Args:
         file_path (str): Full path to the new document.
+        batch_hashes (Set[str]): Chunk hashes queued earlier in this batch.
+
+    Returns:
+        Optional[Tuple[str, List[dict]]]: File hash and chunks, or None if
+        the file should not be indexed.
     """
     logger.info("Processing file: %s", os.path.basename(file_path))
 
@@ -324,30 +636,79 @@ def process_new_documents(file_path: str):
         logger.warning(
             "Hash computation failed for '%s'. Skipping.", file_path
         )
-        return
+        return None
+
+    # Whole-file match: skip parsing and chunking entirely
+    if has_stored_file(file_hash) or has_legacy_copy(file_path, file_hash):
+        logger.warning(
+            "Duplicate document detected: %s. Skipping indexing.",
+            os.path.basename(file_path),
+        )
+        move_to_archive(os.path.basename(file_path), file_hash)
+        return None
 
     chunks = load_document(file_path)
     if not chunks:
         logger.warning("No valid content found in '%s'. Skipping.", file_path)
-        return
+        return None
 
-    doc_collection = chroma_client.get_or_create_collection("doc_index")
-    stored_docs = doc_collection.get()
-    existing_hashes = {
-        meta.get("hash", "") for meta in stored_docs.get("metadatas", [])
-    }
+    for chunk in chunks:
+        chunk["metadata"]["file_hash"] = file_hash
 
-    if any(chunk["metadata"]["hash"] in existing_hashes for chunk in chunks):
+    chunk_hashes = [chunk["metadata"]["hash"] for chunk in chunks]
+    if not batch_hashes.isdisjoint(chunk_hashes) or has_stored_chunks(
+        chunk_hashes
+    ):
         logger.warning(
             "Duplicate document detected: %s. Skipping indexing.",
             os.path.basename(file_path),
         )
-        move_to_archive(os.path.basename(file_path))
-        return
+        move_to_archive(os.path.basename(file_path), file_hash)
+        return None
+
+    batch_hashes.update(chunk_hashes)
+    return file_hash, chunks
+
+
+def _discard_partial_writes(file_hashes: List[str]) -> None:
+    """
+    Deletes chunks a failed index build already wrote for these files.
+
+    LlamaIndex inserts nodes into ChromaDB in groups, so a build that fails
+    part-way leaves some files fully or partly stored. Left in place, their
+    file_hash would make has_stored_file() archive them as duplicates on
+    the next run.
+
+    Args:
+        file_hashes (List[str]): Content hashes of the files in the build.
+    """
+    try:
+        doc_collection.delete(where={"file_hash": {"$in": file_hashes}})
+    except Exception as e:
+        logger.exception("Failed to remove partially indexed chunks: %s", e)
+
+
+def _index_prepared(pending: List[Tuple[str, str, List[dict]]]) -> bool:
+    """
+    Indexes prepared files with a single index build and schedules the
+    storage persist in the background.
+
+    On failure any chunks already written for these files are removed, so
+    the files can be indexed again later.
+
+    Args:
+        pending (List[Tuple[str, str, List[dict]]]): File path, file hash
+        and chunks of each file.
+
+    Returns:
+        bool: True if the index build succeeded.
+    """
+    global _pending_persist
 
     try:
         documents = [
             Document(text=chunk["text"], metadata=chunk["metadata"])
+            for _, _, chunks in pending
             for chunk in chunks
         ]
 
@@ -357,15 +718,81 @@ def process_new_documents(file_path: str):
         index = VectorStoreIndex.from_documents(
             documents, storage_context=storage_context, embed_model=EMBED_MODEL
         )
-        index.storage_context.persist(persist_dir=PERSIST_DIR)
+    except Exception as e:
+        logger.exception(
+            "Error indexing document(s) %s: %s",
+            ", ".join(os.path.basename(path) for path, _, _ in pending),
+            e,
+        )
+        _discard_partial_writes([file_hash for _, file_hash, _ in pending])
+        return False
+
+    # Vectors are already in ChromaDB; write the storage files in the
+    # background so the next batch can start embedding
+    _pending_persist = _persist_executor.submit(
+        index.storage_context.persist, persist_dir=PERSIST_DIR
+    )
+    _pending_persist.add_done_callback(_log_persist_failure)
+    return True
+
+
+def process_new_documents_batch(file_paths: List[str]) -> List[str]:
+    """
+    Processes a batch of new files: splits, checks for duplicates, and
+    indexes all of them into ChromaDB with a single index build.
+
+    If the combined build fails, each file is retried on its own so one bad
+    file cannot block the rest. Only files that were indexed are archived.
+
+    Args:
+        file_paths (List[str]): Full paths to the new documents.
 
+    Returns:
+        List[str]: Paths of the files that were indexed.
+    """
+    batch_hashes: Set[str] = set()
+    pending = []
+
+    for file_path in file_paths:
+        prepared = _prepare_document(file_path, batch_hashes)
+        if prepared:
+            pending.append((file_path, *prepared))
+
+    if not pending:
+        return []
+
+    if _index_prepared(pending):
+        indexed = pending
+    elif len(pending) > 1:
+        logger.warning(
+            "Batch indexing failed; retrying %d files one at a time.",
+            len(pending),
+        )
+        indexed = [entry for entry in pending if _index_prepared([entry])]
+    else:
+        indexed = []
+
+    for file_path, file_hash, chunks in indexed:
+        file_name = os.path.basename(file_path)
         logger.info(
             "Successfully indexed %d chunks from '%s'.",
             len(chunks),
-            os.path.basename(file_path),
-        )
-        move_to_archive(os.path.basename(file_path))
-    except Exception as e:
-        logger.exception(
-            "Error indexing document '%s': %s", os.path.basename(file_path), e
+            file_name,
         )
+        move_to_archive(file_name, file_hash)
+
+    return [file_path for file_path, _, _ in indexed]
+
+
+def process_new_documents(file_path: str) -> bool:
+    """
+    Processes a new file: splits, checks for duplicates, and indexes
+    into ChromaDB.
+
+    Args:
+        file_path (str): Full path to the new document.
+
+    Returns:
+        bool: True if the file was indexed.
+    """
+    return bool(process_new_documents_batch([file_path]))
@@ -2,15 +2,22 @@
 Logging configuration for the ChatRagi application.
 
 Includes both file-based and colored console logging using a custom formatter.
-Supports log rotation and minimizes noise from third-party libraries.
+Supports log rotation, buffers file writes, and minimizes noise from
+third-party libraries.
 """
 
+import functools
 import logging
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, RotatingFileHandler
 
 from chatragi.config import LOG_FILE
 
+# Record layout shared by the file and console handlers
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+_ANSI_RESET = "\033[0m"
+
 
 class ColorFormatter(logging.Formatter):
     """
@@ -25,7 +32,25 @@ class ColorFormatter(logging.Formatter):
         logging.ERROR: "\033[91m",  # Red
         logging.CRITICAL: "\033[95m",  # Magenta
     }
-    RESET = "\033[0m"
+    RESET = _ANSI_RESET
+
+    # Color-wrapped format strings, built once at class definition
+    LEVEL_FORMATS = {
+        level: f"{color}{LOG_FORMAT}{_ANSI_RESET}"
+        for level, color in COLORS.items()
+    }
+
+    def __init__(self, *args, **kwargs):
+        """
+        Builds one formatter per log level up front, so formatting a record
+        does not construct a new Formatter.
+        """
+        super().__init__(*args, **kwargs)
+        self._formatters: dict[int, logging.Formatter] = {
+            level: logging.Formatter(fmt)
+            for level, fmt in self.LEVEL_FORMATS.items()
+        }
+        self._default = logging.Formatter(LOG_FORMAT)
 
     def format(self, record: logging.LogRecord) -> str:
         """
@@ -37,18 +62,17 @@ class ColorFormatter(logging.Formatter):
         Returns:
             str: Formatted log message string with optional ANSI color.
         """
-        log_fmt = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-        if record.levelno in self.COLORS:
-            color = self.COLORS[record.levelno]
-            log_fmt = f"{color}{log_fmt}{self.RESET}"
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno, self._default)
         return formatter.format(record)
 
 
+@functools.lru_cache(maxsize=1)
 def setup_logger() -> logging.Logger:
     """
     Configures and returns a logger instance for the ChatRagi application.
 
+    Setup runs once per process; repeated calls return the same logger.
+
     Returns:
         logging.Logger: Fully configured logger instance.
     """
@@ -57,24 +81,33 @@ def setup_logger() -> logging.Logger:
 
     # Prevent duplicate handlers if setup_logger is called more than once
     if not logger.handlers:
-        # Rotating log file (max 5MB per file, keep 3 backups)
+        # Rotating log file (max 32MB per file, keep 5 backups); the file is
+        # not opened until the first record is written
         file_handler = RotatingFileHandler(
             LOG_FILE,
-            maxBytes=5 * 1024 * 1024,
-            backupCount=3,
-            encoding="utf-8",  # 5MB
-        )
-        file_formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+            maxBytes=32 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8",  # 32MB
+            delay=True,
         )
+        file_formatter = logging.Formatter(LOG_FORMAT)
         file_handler.setFormatter(file_formatter)
 
+        # Buffer file records and write them in batches; errors, a full
+        # buffer, or interpreter shutdown flush the buffer immediately
+        buffered_file_handler = MemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flushOnClose=True,
+        )
+
         # Console logging with color formatter
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(ColorFormatter())
 
         # Attach both handlers
-        logger.addHandler(file_handler)
+        logger.addHandler(buffered_file_handler)
         logger.addHandler(console_handler)
 
         # Suppress noisy logs from third-party modules
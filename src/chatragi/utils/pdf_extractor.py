@@ -0,0 +1,258 @@
+"""
+PDF Text Extraction for ChatRagi
+
+Extracts page text from PDF files. PyMuPDF is used when installed; otherwise,
+or if it fails on a file, pdfplumber is used and the pages of large
+documents are parsed in worker processes, since pdfplumber parsing is
+CPU-bound Python. In that parallel path, each page has its own time budget:
+a page that exceeds it is skipped, and the rest of the document is still
+extracted. If every worker is stuck, extraction fails instead of returning
+a partial document. In-process extraction (PyMuPDF, and PDFs below
+PARALLEL_PAGE_THRESHOLD pages) has no time limit.
+
+Worker processes are only used after start_pdf_workers() has been called,
+and only when the multiprocessing start method is "fork", where workers
+inherit the parent's already-imported modules. Under "spawn" or
+"forkserver" (the defaults on macOS, Windows, and Linux from Python 3.14),
+each worker re-imports the entry script, e.g. file_watcher, which would load
+the embedding models and open ChromaDB in every worker, so large PDFs are
+parsed in-process there instead. The pool is forked once, at start-up, and
+never re-created: forking after other threads are running can deadlock the
+child.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing.pool import Pool
+from typing import Dict, List, Optional, Tuple
+
+import pdfplumber
+
+# Optional PyMuPDF backend (C-based, much faster plain-text extraction)
+try:
+    import fitz  # type: ignore[import]
+except ImportError:
+    fitz = None
+
+# Shared ChatRagi logger, fetched by name to keep this module import-light
+logger = logging.getLogger("ChatRagi")
+
+# PDFs with fewer pages than this are parsed in-process
+PARALLEL_PAGE_THRESHOLD = 16
+
+# Upper bound on worker processes used for page extraction
+MAX_PDF_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+# Seconds allowed per page before the page is skipped
+PAGE_TIMEOUT_SECONDS = 10
+
+# Worker pool, forked by start_pdf_workers() and reused across documents. A
+# multiprocessing Pool is used rather than a ProcessPoolExecutor because its
+# workers can be killed: a worker stuck on a pathological page keeps running
+# after its future is abandoned, and would also block interpreter exit.
+_pool: Optional[Pool] = None
+
+# Worker-side handle on the document being extracted, keyed by path and
+# modification time, so a worker opens each file once rather than per page
+_worker_pdf: Optional[Tuple[Tuple[str, int], "pdfplumber.PDF"]] = None
+
+
+def start_pdf_workers() -> None:
+    """
+    Forks the PDF extraction worker pool.
+
+    Call once at service start-up, before any threads (file observers,
+    executors) are started. Does nothing if the pool is already running,
+    only one worker is allowed, or the start method is not "fork".
+    """
+    global _pool
+    if (
+        _pool is not None
+        or MAX_PDF_WORKERS == 1
+        or multiprocessing.get_start_method() != "fork"
+    ):
+        return
+    _pool = multiprocessing.Pool(processes=MAX_PDF_WORKERS)
+    logger.info("Started %d PDF extraction workers.", MAX_PDF_WORKERS)
+
+
+def _terminate_pool() -> None:
+    """
+    Kills the shared pool's workers, including any stuck mid-parse, and
+    waits for them to exit.
+
+    The pool is not re-created, since this may run after other threads have
+    started; later PDFs are parsed in-process.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+        logger.warning(
+            "PDF extraction workers stopped; large PDFs will be parsed "
+            "in-process until the service restarts."
+        )
+
+
+def extract_page(file_path: str, index: int) -> str:
+    """
+    Extracts the text of one PDF page in a worker process.
+
+    The open document is kept between calls for the same file.
+
+    Args:
+        file_path (str): Path to PDF file.
+        index (int): Page index.
+
+    Returns:
+        str: Page text, or an empty string for pages without text.
+    """
+    global _worker_pdf
+    key = (file_path, os.stat(file_path).st_mtime_ns)
+    if _worker_pdf is None or _worker_pdf[0] != key:
+        if _worker_pdf is not None:
+            _worker_pdf[1].close()
+            _worker_pdf = None
+        _worker_pdf = (key, pdfplumber.open(file_path))
+    return _worker_pdf[1].pages[index].extract_text() or ""
+
+
+def _extract_pages_parallel(
+    pool: Pool, file_path: str, page_count: int
+) -> List[str]:
+    """
+    Extracts pages on the worker pool, giving each page its own deadline.
+
+    At most one page per free worker is in flight, so a page starts running
+    when it is submitted and its deadline measures only its own parse time.
+    A page that misses its deadline is skipped and its worker is counted as
+    stuck; if any page was skipped the pool is stopped afterwards.
+
+    Args:
+        pool (Pool): PDF extraction worker pool.
+        file_path (str): Path to PDF file.
+        page_count (int): Number of pages in the document.
+
+    Returns:
+        List[str]: Page texts, empty strings for skipped pages.
+
+    Raises:
+        TimeoutError: If every worker got stuck before all pages ran.
+        Exception: The first error raised while extracting a page.
+    """
+    file_name = os.path.basename(file_path)
+    finished: "queue.Queue[Tuple[int, bool, object]]" = queue.Queue()
+    texts = [""] * page_count
+    in_flight: Dict[int, float] = {}  # page index -> deadline
+    capacity = MAX_PDF_WORKERS
+    next_page = 0
+    skipped = 0
+    error: Optional[BaseException] = None
+
+    while in_flight or (
+        error is None and next_page < page_count and capacity > 0
+    ):
+        while error is None and next_page < page_count:
+            if len(in_flight) >= capacity:
+                break
+            pool.apply_async(
+                extract_page,
+                (file_path, next_page),
+                callback=lambda text, i=next_page: finished.put(
+                    (i, True, text)
+                ),
+                error_callback=lambda exc, i=next_page: finished.put(
+                    (i, False, exc)
+                ),
+            )
+            in_flight[next_page] = time.monotonic() + PAGE_TIMEOUT_SECONDS
+            next_page += 1
+
+        timeout = max(0.0, min(in_flight.values()) - time.monotonic())
+        try:
+            index, ok, value = finished.get(timeout=timeout)
+        except queue.Empty:
+            now = time.monotonic()
+            for index, deadline in list(in_flight.items()):
+                if deadline <= now:
+                    del in_flight[index]
+                    skipped += 1
+                    capacity -= 1
+                    logger.warning(
+                        "Timed out extracting page %d of '%s'. Skipping.",
+                        index + 1,
+                        file_name,
+                    )
+            continue
+
+        # Late results of pages that were already skipped are ignored
+        if in_flight.pop(index, None) is None:
+            continue
+        if ok:
+            texts[index] = value
+        elif error is None:
+            error = value
+
+    # Kill workers still parsing skipped pages instead of leaving them
+    # running in the background
+    if skipped:
+        _terminate_pool()
+
+    if error is not None:
+        raise error
+    if next_page < page_count:
+        raise TimeoutError(
+            f"All PDF workers timed out on '{file_name}'; "
+            f"{page_count - next_page} pages were not extracted."
+        )
+    return texts
+
+
+def _extract_with_pymupdf(file_path: str) -> str:
+    """
+    Extracts PDF text with PyMuPDF.
+
+    Args:
+        file_path (str): Path to PDF file.
+
+    Returns:
+        str: Document text; pages without text are skipped.
+    """
+    with fitz.open(file_path) as doc:
+        texts = [page.get_text() for page in doc]
+    return "\n\n".join(text for text in texts if text)
+
+
+def extract_pdf_text(file_path: str) -> str:
+    """
+    Extracts the text of every page, joined by blank lines.
+
+    Args:
+        file_path (str): Path to PDF file.
+
+    Returns:
+        str: Document text; pages without text are skipped.
+    """
+    if fitz is not None:
+        try:
+            return _extract_with_pymupdf(file_path)
+        except Exception as e:
+            logger.warning(
+                "PyMuPDF failed on '%s', falling back to pdfplumber: %s",
+                os.path.basename(file_path),
+                e,
+            )
+
+    pool = _pool
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        if page_count < PARALLEL_PAGE_THRESHOLD or pool is None:
+            texts = [page.extract_text() or "" for page in pdf.pages]
+            return "\n\n".join(text for text in texts if text)
+
+    texts = _extract_pages_parallel(pool, file_path, page_count)
+    return "\n\n".join(text for text in texts if text)
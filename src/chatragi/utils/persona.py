@@ -18,6 +18,15 @@ class PersonaTone(str, Enum):
     WITTY = "witty"
 
 
+# Prompt prefix per tone; tones without an entry leave the text unchanged
+_TONE_PREFIXES = {
+    PersonaTone.PROFESSIONAL: (
+        "As a professional, I would explain it like this:\n\n"
+    ),
+    PersonaTone.WITTY: "Alright, let's jazz this up with some wit:\n\n",
+}
+
+
 def apply_persona_tone(text: str, tone: PersonaTone) -> str:
     """
     Adjusts the user query text based on the selected persona tone.
@@ -29,9 +38,5 @@ def apply_persona_tone(text: str, tone: PersonaTone) -> str:
     Returns:
         str: Modified query text to influence LLM response style.
     """
-    if tone == PersonaTone.PROFESSIONAL:
-        return f"As a professional, I would explain it like this:\n\n{text}"
-    elif tone == PersonaTone.WITTY:
-        return f"Alright, let's jazz this up with some wit:\n\n{text}"
-    else:
-        return text  # Default, no adjustment
+    prefix = _TONE_PREFIXES.get(tone)
+    return prefix + text if prefix else text  # Default, no adjustment
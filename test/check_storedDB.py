@@ -1,32 +1,97 @@
+import argparse
 import csv
-import textwrap
+import gzip
+import io
+import itertools
+import operator
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-import chromadb
+WRAP_WIDTH = 100  # Character width for visual chunking
+BATCH_SIZE = 1000  # Records fetched per ChromaDB request
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB output buffer for CSV files
+GZIP_COMPRESS_LEVEL = 3  # Most of level 9's ratio at a fraction of the CPU
 
-from chatragi.config import DB_PATH
+# Collections to export:
+# (name, output file, headers, metadata column, missing value, summary label)
+EXPORTS = (
+    (
+        "doc_index",
+        "documents.csv",
+        ["Document Chunk", "File Name"],
+        "file_name",
+        "Unknown File",
+        "document chunks",
+    ),
+    (
+        "chat_memory",
+        "chat_memory.csv",
+        ["Chat Message", "Session ID"],
+        "session_id",
+        "N/A",
+        "memories",
+    ),
+)
 
-WRAP_WIDTH = 100  # Character width for visual chunking
+# Newlines become spaces, carriage returns are dropped
+_NEWLINE_TABLE = str.maketrans({"\n": " ", "\r": ""})
+
+
+def open_csv_output(filename, compress=False):
+    """
+    Opens a buffered UTF-8 text stream for CSV output.
+
+    Compressed output is gzip-encoded behind a WRITE_BUFFER_SIZE buffer, so
+    the CSV writer's small writes reach the compressor in large blocks.
+
+    Args:
+        filename (str): Path of the output file.
+        compress (bool): Write gzip-compressed output.
+
+    Returns:
+        TextIO: Stream to write CSV rows to; closing it closes the file.
+    """
+    if not compress:
+        return open(
+            filename,
+            mode="w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        )
+
+    gz = gzip.GzipFile(filename, mode="wb", compresslevel=GZIP_COMPRESS_LEVEL)
+    buffered = io.BufferedWriter(gz, buffer_size=WRITE_BUFFER_SIZE)
+    return io.TextIOWrapper(buffered, encoding="utf-8", newline="")
 
 
-def write_to_csv(filename, rows, headers):
+def write_to_csv(filename, rows, headers, compress=False):
     """
-    Writes a list of rows to a CSV file with specified headers.
+    Writes rows to a CSV file with specified headers.
+
+    Rows are consumed lazily, so a generator can be streamed straight to
+    disk without materializing the full table.
 
     Args:
         filename (str): Name of the output CSV file.
-        rows (List[List[str]]): List of rows,
-        each row is a list of string values.
+        rows (Iterable[Sequence[str]]): Rows to write, each a sequence of
+        string values.
         headers (List[str]): List of column headers.
+        compress (bool): Write gzip-compressed output.
     """
-    with open(filename, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
+    with open_csv_output(filename, compress) as file:
+        # Text mode is already fully buffered, and the UTF-8 encoder has an
+        # ASCII fast path; pre-encoding cells measured slower, not faster
+        writer = csv.writer(file, lineterminator="\n")
         writer.writerow(headers)
         writer.writerows(rows)
 
 
 def format_text(text, width=WRAP_WIDTH):
     """
-    Wraps long text into chunks with soft separators for better readability.
+    Splits long text into fixed-width chunks with soft separators for better
+    readability.
 
     Args:
         text (str): The input text.
@@ -35,59 +100,221 @@ def format_text(text, width=WRAP_WIDTH):
     Returns:
         str: Formatted string with soft separators.
     """
-    text = text.strip().replace("\n", " ").replace("\r", "")
-    chunks = textwrap.wrap(text, width=width)
-    return " | ".join(chunks)
+    text = text.strip().translate(_NEWLINE_TABLE)
+    bounds = range(0, len(text) + width, width)
+    return " | ".join(
+        text[start:end] for start, end in zip(bounds, bounds[1:])
+    )
+
+
+def iter_pages(collection, batch_size=BATCH_SIZE):
+    """
+    Streams a collection page by page as parallel document/metadata lists.
+
+    Only documents and metadatas are fetched; embeddings are never loaded.
+
+    Args:
+        collection: ChromaDB collection to read.
+        batch_size (int): Number of records per request.
+
+    Yields:
+        Tuple[List[str], List[dict]]: One page of documents and their
+        metadatas.
+    """
+    offset = 0
+    while True:
+        page = collection.get(
+            limit=batch_size,
+            offset=offset,
+            include=["documents", "metadatas"],
+        )
+        documents = page.get("documents") or []
+        if not documents:
+            return
+
+        yield documents, page.get("metadatas") or []
+
+        if len(documents) < batch_size:
+            return
+        offset += batch_size
+
+
+def echo_pages(pages, verbose=False):
+    """
+    Passes pages through unchanged, echoing their records to stdout when
+    verbose.
+
+    Output is written with one stdout write per page rather than one write
+    per record.
+
+    Args:
+        pages (Iterable[Tuple[List[str], List[dict]]]): Document and
+        metadata pages.
+        verbose (bool): Whether to print each record.
+
+    Yields:
+        Tuple[List[str], List[dict]]: The input pages.
+    """
+    for documents, metadatas in pages:
+        if verbose:
+            sys.stdout.write(
+                "".join(
+                    f"Document: {doc} -> {meta}\n\n---\n"
+                    for doc, meta in zip(documents, metadatas)
+                )
+            )
+        yield documents, metadatas
+
+
+def get_collection_or_none(chroma_client, name):
+    """
+    Fetches a collection by name without listing every collection first.
+
+    Args:
+        chroma_client: ChromaDB client to query.
+        name (str): Collection name.
+
+    Returns:
+        Collection or None: The collection, or None if it does not exist.
+    """
+    from chromadb.errors import ChromaError
 
+    # Missing collections raise ValueError before ChromaDB 0.6 and a
+    # ChromaError subclass from 0.6 on
+    try:
+        return chroma_client.get_collection(name)
+    except (ValueError, ChromaError):
+        return None
 
-def export_chromadb_contents():
+
+def export_collection(
+    collection,
+    path,
+    headers,
+    meta_key,
+    default,
+    render=format_text,
+    verbose=False,
+    compress=False,
+):
+    """
+    Streams one collection to a CSV file.
+
+    Args:
+        collection: ChromaDB collection to export.
+        path (str): Output CSV file path.
+        headers (List[str]): List of column headers.
+        meta_key (str): Metadata field written next to each document.
+        default (str): Value used when a record lacks `meta_key`.
+        render (Callable[[str], str]): Formats each document's text.
+        verbose (bool): Print every exported record.
+        compress (bool): Write gzip-compressed output.
+
+    Returns:
+        int: Number of records exported; 0 if the collection is empty, in
+        which case no file is written.
+    """
+    count = collection.count()
+    if not count:
+        return 0
+
+    # Rows are zipped from each page's column lists without building
+    # intermediate row lists
+    get_meta = operator.methodcaller("get", meta_key, default)
+    rows = itertools.chain.from_iterable(
+        zip(map(render, documents), map(get_meta, metadatas))
+        for documents, metadatas in echo_pages(iter_pages(collection), verbose)
+    )
+    write_to_csv(path, rows, headers=headers, compress=compress)
+    return count
+
+
+def export_chromadb_contents(
+    verbose=False, format_rows=True, output_dir=".", compress=False
+):
     """
     Connects to ChromaDB, retrieves documents and chatbot memory,
     and exports them to CSV files.
+
+    Args:
+        verbose (bool): Print every exported record, not just a summary.
+        format_rows (bool): Split text into fixed-width chunks; when False,
+        text is written as stored.
+        output_dir (str): Directory the CSV files are written to.
+        compress (bool): Write gzip-compressed `.csv.gz` files.
     """
+    # Imported here so `--help` and argument errors skip loading the app
+    # config (models, embeddings) and ChromaDB
+    import chromadb
+
+    from chatragi.config import DB_PATH
+    from chatragi.utils.logger_config import logger
+
     chroma_client = chromadb.PersistentClient(path=DB_PATH)
-    collection_names = chroma_client.list_collections()
-
-    # Export documents
-    if "doc_index" in collection_names:
-        doc_collection = chroma_client.get_collection("doc_index")
-        stored_docs = doc_collection.get()
-
-        if stored_docs.get("documents"):
-            document_rows = [
-                [format_text(doc), meta.get("file_name", "Unknown File")]
-                for doc, meta in zip(
-                    stored_docs["documents"],
-                    stored_docs["metadatas"],
-                )
-            ]
-            write_to_csv(
-                "documents.csv",
-                document_rows,
-                headers=["Document Chunk", "File Name"],
-            )
+    render = format_text if format_rows else str
+    os.makedirs(output_dir, exist_ok=True)
 
-    # Export chat memory
-    if "chat_memory" in collection_names:
-        memory_collection = chroma_client.get_collection("chat_memory")
-        all_memories = memory_collection.get()
+    def export(spec):
+        name, filename, headers, meta_key, default, label = spec
+        collection = get_collection_or_none(chroma_client, name)
+        if collection is None:
+            return
 
-        if all_memories.get("documents"):
-            memory_rows = [
-                [format_text(doc), meta.get("session_id", "N/A")]
-                for doc, meta in zip(
-                    all_memories["documents"], all_memories["metadatas"]
-                )
-            ]
-            write_to_csv(
-                "chat_memory.csv",
-                memory_rows,
-                headers=["Chat Message", "Session ID"],
-            )
+        path = os.path.join(output_dir, filename)
+        if compress:
+            path += ".gz"
+        count = export_collection(
+            collection,
+            path,
+            headers,
+            meta_key,
+            default,
+            render=render,
+            verbose=verbose,
+            compress=compress,
+        )
+        if count:
+            logger.info("Exported %d %s to %s", count, label, path)
+
+    # Collections are independent, so export them concurrently
+    with ThreadPoolExecutor(max_workers=len(EXPORTS)) as executor:
+        list(executor.map(export, EXPORTS))
 
 
 if __name__ == "__main__":
     """
     Main function to export ChromaDB contents to CSV files.
     """
-    export_chromadb_contents()
+    parser = argparse.ArgumentParser(
+        description="Export ChromaDB documents and chat memory to CSV."
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print every exported record instead of a summary.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="format_rows",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Split exported text into fixed-width chunks (default: on).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="Directory to write the CSV files to (default: current).",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write gzip-compressed .csv.gz files.",
+    )
+    args = parser.parse_args()
+
+    export_chromadb_contents(
+        verbose=args.verbose,
+        format_rows=args.format_rows,
+        output_dir=args.output_dir,
+        compress=args.gzip,
+    )
@@ -1,18 +1,29 @@
+import argparse
 import csv
+import itertools
+import logging
+import os
+import statistics
+import sys
 import time
 
 from langchain_ollama import OllamaLLM
 
+# Script-local logger; the ChatRagi logger would import the app config and
+# build its models just to print benchmark progress
+logger = logging.getLogger(__name__)
+
 # === Configuration Section ===
 
 # List of GPU layer settings to benchmark.
 # Increasing num_gpu_layers shifts more computation to GPU.
 GPU_LAYER_OPTIONS = [1, 10, 20, 30]
 
-# Prompt sent to the model for performance comparison.
+# Default prompt sent to the model for performance comparison.
+# Override with `--prompt <file>`.
 TEST_PROMPT = "What's Goodhart's Law?"
 
-# Name of the model to benchmark.
+# Default model to benchmark. Override with `--models a,b,...`.
 # Must already be pulled via `ollama pull <model-name>`.
 # Options: "phi4:14b-q8_0", "llama3.2:3b", "qwq:32b", "phi4:14b-q4_K_M"
 LLM_MODEL_NAME = "phi4:14b-q8_0"
@@ -20,42 +31,99 @@ LLM_MODEL_NAME = "phi4:14b-q8_0"
 # Output file where benchmarking results will be stored.
 CSV_FILENAME = "gpu_layer_benchmark_results.csv"
 
+# Column layout of the results file; runs append only to matching files
+CSV_HEADER = [
+    "model",
+    "num_gpu_layers",
+    "response_time_sec",
+    "response_time_stdev_sec",
+    "response_preview",
+]
+
+# Timed requests per GPU layer setting, after one untimed warmup request.
+# The warmup absorbs the model (re)load so only inference is measured.
+REPEATS = 3
+WARMUP_PROMPT = "ping"
+
+# Userspace buffer for the results file (bytes)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Rows collected before they are written and flushed together, so partial
+# results survive an interrupted run without a write per row
+FLUSH_EVERY_ROWS = 4
+
+
+def read_csv_header(filename):
+    """
+    Reads the header row of an existing results file.
+
+    Args:
+        filename (str): Path to the CSV file.
+
+    Returns:
+        List[str] or None: The first row, or None if the file is missing
+        or empty.
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename, newline="", encoding="utf-8") as file:
+        return next(csv.reader(file), None)
+
 
-def benchmark_model_response():
+def benchmark_model_response(models=None, prompt=TEST_PROMPT):
     """
     Benchmarks model response time for various `num_gpu_layers` settings
     using OllamaLLM.
 
-    Sends a fixed prompt to a specified model with varying GPU acceleration
-    settings, logs the response time and a preview of the model's output,
-    and saves results to a CSV file.
+    Sends a fixed prompt to each model with varying GPU acceleration
+    settings. Each setting gets one untimed warmup request followed by
+    REPEATS timed requests; the mean and standard deviation of the response
+    time and a preview of the model's output are saved to a CSV file.
+    The header row is only written when the file is new; an existing file
+    with a different column layout is never appended to.
+
+    Args:
+        models (List[str], optional): Models to benchmark. Defaults to
+        [LLM_MODEL_NAME].
+        prompt (str): Prompt sent on every timed request.
 
     Raises:
+        ValueError: If CSV_FILENAME exists with a different header, e.g.
+        results from an older version of this script.
         Any exceptions encountered while invoking the model are caught and
         logged per test.
     """
 
-    # Open CSV file and write the header row
-    with open(CSV_FILENAME, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(
-            [
-                "num_gpu_layers",
-                "response_time_sec",
-                "response_preview",
-                LLM_MODEL_NAME,
-            ]
+    models = models or [LLM_MODEL_NAME]
+    existing_header = read_csv_header(CSV_FILENAME)
+    if existing_header is not None and existing_header != CSV_HEADER:
+        raise ValueError(
+            f"'{CSV_FILENAME}' has columns {existing_header}, expected "
+            f"{CSV_HEADER}. Move or rename it before running the benchmark."
         )
-
-        # Iterate through each GPU layer configuration
-        for num_layers in GPU_LAYER_OPTIONS:
-            print(f"\n🔧 Testing with num_gpu_layers = {num_layers}...")
+    write_header = existing_header is None
+
+    # Open CSV file once for every model and write the header row if new
+    with open(
+        CSV_FILENAME, mode="a", newline="", buffering=WRITE_BUFFER_SIZE
+    ) as file:
+        writer = csv.writer(file, lineterminator="\n")
+        if write_header:
+            writer.writerow(CSV_HEADER)
+
+        pending_rows = []
+
+        # Iterate through each model and GPU layer configuration
+        for model, num_layers in itertools.product(models, GPU_LAYER_OPTIONS):
+            logger.info(
+                "Testing %s with num_gpu_layers = %d...", model, num_layers
+            )
 
             # Initialize OllamaLLM with specified model and hardware settings
             # num_gpu_layers - Number of layers to offload to GPU
             # quantization - Reduces memory usage (at some accuracy cost)
             llm = OllamaLLM(
-                model=LLM_MODEL_NAME,
+                model=model,
                 request_timeout=360.0,
                 options={
                     "num_gpu_layers": num_layers,
@@ -63,33 +131,98 @@ def benchmark_model_response():
                 },
             )
 
-            start_time = time.time()
             try:
-                # Send prompt and measure response time
-                response = llm.invoke(TEST_PROMPT)
-                elapsed_time = time.time() - start_time
+                # Load the model with these settings outside of the timing
+                llm.invoke(WARMUP_PROMPT)
 
-                # Display results to console
-                print(f"🧠 Response: {response.strip()}")
-                print(f"⏱️ Time taken: {elapsed_time:.2f} seconds")
+                # Send prompt and measure response time
+                timings = []
+                for _ in range(REPEATS):
+                    start_time = time.perf_counter()
+                    response = llm.invoke(prompt)
+                    timings.append(time.perf_counter() - start_time)
+
+                mean_time = statistics.mean(timings)
+                stdev_time = statistics.stdev(timings) if REPEATS > 1 else 0.0
+
+                # Slice before stripping to avoid copying the full response
+                preview = response[:100].strip()
+
+                # Log results to console and log file
+                logger.info("Response: %s", preview)
+                logger.info(
+                    "Time taken: %.2f +/- %.2f seconds over %d runs",
+                    mean_time,
+                    stdev_time,
+                    REPEATS,
+                )
 
-                # Write result to CSV (preview first 100 chars of response)
-                writer.writerow(
-                    [
+                # Queue result for the CSV (first 100 chars of response)
+                pending_rows.append(
+                    (
+                        model,
                         num_layers,
-                        round(elapsed_time, 2),
-                        response.strip()[:100],
-                    ]
+                        round(mean_time, 2),
+                        round(stdev_time, 2),
+                        preview,
+                    )
                 )
 
             except Exception as e:
                 # Log any errors encountered with this config
-                print(f"❌ Error at num_gpu_layers={num_layers}: {e}")
-                writer.writerow([num_layers, "ERROR", str(e)[:100]])
+                logger.exception(
+                    "Error for %s at num_gpu_layers=%d: %s",
+                    model,
+                    num_layers,
+                    e,
+                )
+                pending_rows.append(
+                    (model, num_layers, "ERROR", "", str(e)[:100])
+                )
+
+            if len(pending_rows) >= FLUSH_EVERY_ROWS:
+                writer.writerows(pending_rows)
+                file.flush()
+                pending_rows.clear()
+
+        writer.writerows(pending_rows)
 
 
 if __name__ == "__main__":
     """
     Main function to run the GPU benchmark test.
     """
-    benchmark_model_response()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark Ollama response times across GPU layers."
+    )
+    parser.add_argument(
+        "--models",
+        default=LLM_MODEL_NAME,
+        help=f"Comma-separated models to benchmark (default: {LLM_MODEL_NAME}).",
+    )
+    parser.add_argument(
+        "--prompt",
+        metavar="FILE",
+        help="File containing the prompt to send (default: built-in prompt).",
+    )
+    args = parser.parse_args()
+
+    prompt = TEST_PROMPT
+    if args.prompt:
+        with open(args.prompt, encoding="utf-8") as prompt_file:
+            prompt = prompt_file.read().strip()
+
+    try:
+        benchmark_model_response(
+            models=[
+                name.strip() for name in args.models.split(",") if name.strip()
+            ],
+            prompt=prompt,
+        )
+    except ValueError as e:
+        logger.error("%s", e)
+        sys.exit(1)